@@ -2,91 +2,327 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
+import argparse
+import hashlib
+import importlib.util
+import shutil
 import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def main():
-    print("Mauscribe Build Script")
-    print("=" * 40)
-    
-    # Check if PyInstaller is installed
+# pip package name -> import name; PyInstaller plus the third-party modules
+# src/ actually imports (requirements*.txt lists a few more the app doesn't use)
+REQUIRED_PACKAGES = {
+    "pyinstaller": "PyInstaller",
+    "faster-whisper": "faster_whisper",
+    "numpy": "numpy",
+    "sounddevice": "sounddevice",
+    "pynput": "pynput",
+    "pyperclip": "pyperclip",
+    "pyautogui": "pyautogui",
+    "pystray": "pystray",
+    "pillow": "PIL",
+    "pyspellchecker": "spellchecker",
+    "requests": "requests",
+}
+
+# Windows-only packages used by sound_controller (see requirements-windows.txt)
+if sys.platform == "win32":
+    REQUIRED_PACKAGES.update({
+        "pycaw": "pycaw",
+        "comtypes": "comtypes",
+    })
+
+# Stdlib/tooling modules the app never imports; keeps them out of the bundle
+EXCLUDED_MODULES = [
+    "tkinter",
+    "test",
+    "lib2to3",
+    "pydoc",
+    "distutils",
+    "pip",
+]
+
+# Generated on the first build, reused while the PyInstaller options stay the
+# same (their hash is kept in BUILD_CACHE); --clean forces a regeneration
+SPEC_FILE = "mauscribe.spec"
+
+# Wheel cache reused by pip across builds
+PIP_CACHE = Path(".pip_cache")
+
+# Remembers the options SPEC_FILE was generated with
+BUILD_CACHE = Path(".build_cache.json")
+
+# Seconds before a hanging PyInstaller run is killed
+BUILD_TIMEOUT = 600
+
+def _is_installed(item):
+    package, import_name = item
+    # find_spec only locates the module, it does not execute it
     try:
-        import PyInstaller
-        print("PyInstaller found")
-    except ImportError:
-        print("PyInstaller not found")
-        print("Installing PyInstaller...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"])
-    
-    # Check if icon exists
-    icon_path = Path("icons/mauscribe_icon.ico")
-    if icon_path.exists():
-        print(f"Icon found: {icon_path}")
-        icon_arg = f"--icon={icon_path}"
+        return package, importlib.util.find_spec(import_name) is not None
+    except (ImportError, ValueError):
+        return package, False
+
+def _load_build_cache():
+    try:
+        with open(BUILD_CACHE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_build_cache(**entries):
+    cache = _load_build_cache()
+    cache.update(entries)
+    try:
+        with open(BUILD_CACHE, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"Could not write build cache: {e}")
+
+def _pip_install_cmd(packages):
+    cmd = [sys.executable, "-m", "pip", "install", "--prefer-binary"]
+    # Keep downloaded wheels next to the project unless a cache is configured
+    # (CI sets PIP_CACHE_DIR and caches it between runs)
+    if not os.environ.get("PIP_CACHE_DIR"):
+        cmd.append(f"--cache-dir={PIP_CACHE}")
+    return cmd + list(packages)
+
+def _install_package(package):
+    result = subprocess.run(_pip_install_cmd([package]), capture_output=True, text=True)
+    return package, result.returncode == 0
+
+def _report_install(package, ok, failed_packages):
+    if ok:
+        print(f"Installed {package}")
     else:
-        print("Icon not found, using default icon")
-        icon_arg = ""
+        print(f"Could not install {package}")
+        failed_packages.append(package)
+
+def check_dependencies():
+    print("Checking dependencies...")
+    
+    # Probes are dominated by filesystem lookups, so run them concurrently
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(_is_installed, REQUIRED_PACKAGES.items()))
+    missing_packages = [package for package, ok in results if not ok]
+    
+    if not missing_packages:
+        print("All dependencies found")
+        return True
+    
+    print(f"Missing packages: {', '.join(missing_packages)}")
+    print("Installing missing packages...")
     
-    # Clean old build files
+    # One pip run for all packages; only show pip's progress on a terminal
+    capture = not sys.stdout.isatty()
+    result = subprocess.run(_pip_install_cmd(missing_packages), capture_output=capture, text=True)
+    if result.returncode == 0:
+        print("All missing packages installed")
+        return True
+    
+    # Batch failed - retry one by one to find the culprit
+    print("Batch install failed, retrying packages individually...")
+    failed_packages = []
+    
+    # Sequentially: concurrent pip runs would write into the same site-packages
+    # without a lock and could leave a shared dependency half-installed
+    for package in missing_packages:
+        package, ok = _install_package(package)
+        _report_install(package, ok, failed_packages)
+    
+    return not failed_packages
+
+def clean_build_files(full=False):
     print("Cleaning old build files...")
-    if Path("dist").exists():
-        import shutil
-        shutil.rmtree("dist")
-    if Path("build").exists():
-        import shutil
-        shutil.rmtree("build")
-    if Path("mauscribe.spec").exists():
-        Path("mauscribe.spec").unlink()
-    
-    # PyInstaller command
-    cmd = [
-        sys.executable, "-m", "PyInstaller",
-        "--onefile",           # Single .exe file
+    dirs_to_clean = {"dist", "__pycache__"}
+    files_to_clean = set()
+    # build/ holds PyInstaller's analysis cache for the spec file, keep both
+    # unless a full rebuild was requested
+    if full:
+        dirs_to_clean.add("build")
+        files_to_clean.add(SPEC_FILE)
+    
+    # Single directory scan instead of one exists() check per path
+    dirs_found = []
+    with os.scandir(".") as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in dirs_to_clean:
+                    dirs_found.append(entry.path)
+            elif entry.name in files_to_clean or entry.name.endswith(".pyc"):
+                os.unlink(entry.path)
+    
+    # Stale bytecode lives in __pycache__ dirs below src/; drop each dir as a
+    # whole instead of unlinking the .pyc files one by one
+    dirs_found.extend(str(path) for path in Path("src").rglob("__pycache__"))
+    
+    # rmtree of PyInstaller's build tree is I/O bound, remove the dirs in parallel
+    if dirs_found:
+        with ThreadPoolExecutor(max_workers=min(len(dirs_found), 8)) as executor:
+            list(executor.map(lambda path: shutil.rmtree(path, ignore_errors=True), dirs_found))
+
+def test_executable(exe_path):
+    # One stat call answers both "exists?" and "how big?"
+    try:
+        size_bytes = os.stat(exe_path).st_size
+    except FileNotFoundError:
+        print(".exe was not created")
+        return False
+    
+    print(f".exe created: {exe_path}")
+    print(f"Size: {size_bytes / (1024 * 1024):.1f} MB")
+    
+    # The app has no CLI and keeps running, so only check that it starts
+    # and is still alive after a moment instead of waiting for a timeout
+    print("Testing .exe...")
+    try:
+        process = subprocess.Popen([str(exe_path)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        print(f".exe test: {e}")
+        return True
+    
+    try:
+        returncode = process.wait(timeout=1)
+        print(f".exe exited immediately (exit code {returncode})")
+    except subprocess.TimeoutExpired:
+        print(".exe starts")
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return True
+
+def _pyinstaller_options(mode, icon_arg):
+    options = [
+        f"--{mode}",           # Single .exe file or folder
         "--windowed",          # No console window
         "--name=mauscribe",    # .exe name
         "--clean",             # Clean build
+        "--noconfirm",         # Overwrite dist/ without asking
         "--hidden-import=spellchecker",  # Explicitly include pyspellchecker
         "--hidden-import=requests",      # Explicitly include requests
         "--collect-data=spellchecker",   # Include data files
-        "main.py"              # Main file
     ]
     
     # Add icon if available
     if icon_arg:
-        cmd.insert(-1, icon_arg)
+        options.append(icon_arg)
+    
+    # Smaller archive = less to unpack on every start of the onefile .exe
+    options.extend(f"--exclude-module={module}" for module in EXCLUDED_MODULES)
+    
+    options.append("main.py")  # Main file
+    return options
+
+def _options_hash(options):
+    return hashlib.sha256("\0".join(options).encode()).hexdigest()
+
+def build_executable(mode, icon_arg):
+    options = _pyinstaller_options(mode, icon_arg)
+    options_hash = _options_hash(options)
+    
+    if os.path.exists(SPEC_FILE) and _load_build_cache().get("spec_options") == options_hash:
+        # Same options as last time: reuse the spec, PyInstaller can then
+        # reuse its cached analysis
+        print(f"Reusing {SPEC_FILE}")
+        cmd = [
+            sys.executable, "-O",  # Bundle optimized bytecode (asserts stripped)
+            "-m", "PyInstaller",
+            "--noconfirm",         # Overwrite dist/ without asking
+            SPEC_FILE
+        ]
+    else:
+        # PyInstaller command (also writes mauscribe.spec for the next build);
+        # forget the old hash until this build has succeeded
+        _save_build_cache(spec_options=None)
+        cmd = [
+            sys.executable, "-O",  # Bundle optimized bytecode (asserts stripped)
+            "-m", "PyInstaller",
+        ] + options
     
     print("Starting build...")
     print(f"Command: {' '.join(cmd)}")
     
-    # Execute build
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    # Execute build, streaming PyInstaller's log instead of buffering all of it
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, bufsize=1)
+    # Reading stdout blocks until PyInstaller exits, so enforce the deadline
+    # from a timer; killing the process closes the pipe and ends the loop
+    timed_out = threading.Event()
+    def _kill():
+        timed_out.set()
+        process.kill()
+    timer = threading.Timer(BUILD_TIMEOUT, _kill)
+    timer.start()
+    output_tail = deque(maxlen=200)
+    try:
+        for line in process.stdout:
+            sys.stdout.write(line)
+            output_tail.append(line)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
     
-    if result.returncode == 0:
-        print("Build successful!")
-        
-        # Check if .exe was created
-        exe_path = Path("dist/mauscribe.exe")
-        if exe_path.exists():
-            size_mb = exe_path.stat().st_size / (1024 * 1024)
-            print(f".exe created: {exe_path}")
-            print(f"Size: {size_mb:.1f} MB")
-            
-            # Test the .exe
-            print("Testing .exe...")
-            try:
-                test_result = subprocess.run([str(exe_path), "--help"], 
-                                          capture_output=True, text=True, timeout=5)
-                print(".exe works")
-            except subprocess.TimeoutExpired:
-                print(".exe starts (Timeout = OK)")
-            except Exception as e:
-                print(f".exe test: {e}")
-        else:
-            print(".exe was not created")
-    else:
+    if timed_out.is_set():
+        print(f"Build timed out after {BUILD_TIMEOUT} seconds!")
+        return False
+    
+    if returncode != 0:
         print("Build failed!")
-        print("Error:")
-        print(result.stderr)
+        print("Error (last lines of output):")
+        print("".join(output_tail))
+        return False
+    
+    # The spec now matches these options
+    _save_build_cache(spec_options=options_hash)
+    print("Build successful!")
+    return True
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the Mauscribe executable")
+    parser.add_argument(
+        "--mode", choices=["onefile", "onedir"], default="onefile",
+        help="onefile: single .exe (unpacked to a temp dir on every start), "
+             "onedir: folder with the .exe and its files (starts much faster)"
+    )
+    parser.add_argument(
+        "--clean", action="store_true",
+        help=f"remove build/ and {SPEC_FILE} and rebuild from scratch"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    print("Mauscribe Build Script")
+    print("=" * 40)
+    
+    if not check_dependencies():
+        print("Dependency installation failed!")
+        sys.exit(1)
+    
+    # Check if icon exists
+    icon_path = Path("icons/mauscribe_icon.ico")
+    if icon_path.exists():
+        print(f"Icon found: {icon_path}")
+        icon_arg = f"--icon={icon_path}"
+    else:
+        print("Icon not found, using default icon")
+        icon_arg = ""
+    
+    clean_build_files(full=args.clean)
+    
+    if build_executable(args.mode, icon_arg):
+        if args.mode == "onedir":
+            test_executable(Path("dist/mauscribe/mauscribe.exe"))
+        else:
+            test_executable(Path("dist/mauscribe.exe"))
     
     print("=" * 40)
     print("Build completed!")
@@ -8,11 +8,10 @@ Simple entry point
 import sys
 from pathlib import Path
 
-# Add the project root to Python path
-project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
+if __name__ == '__main__':
+    # Add the project root to Python path (only when run as a script)
+    sys.path.insert(0, str(Path(__file__).parent))
 
-from src.main import main
+    from src.main import main
 
-if __name__ == '__main__':
     main()
@@ -69,21 +69,21 @@ class MauscribeApp:
         """Initialize the system tray icon and menu."""
         icon_image = self._create_system_tray_icon()
         
+        # Menu label -> handler, also defines the menu order
+        menu_actions = {
+            "Status": self._print_status,
+            "Open Config": self._open_config_file,
+            "Exit": self.stop,
+        }
+        
         def on_clicked(icon, item):
             """Handle system tray menu item clicks."""
-            if str(item) == "Status":
-                self._print_status()
-            elif str(item) == "Open Config":
-                self._open_config_file()
-            elif str(item) == "Exit":
-                self.stop()
+            handler = menu_actions.get(str(item))
+            if handler:
+                handler()
                 
         # Create system tray menu
-        menu = (
-            pystray.MenuItem("Status", on_clicked),
-            pystray.MenuItem("Open Config", on_clicked),
-            pystray.MenuItem("Exit", on_clicked)
-        )
+        menu = tuple(pystray.MenuItem(label, on_clicked) for label in menu_actions)
         
         self.system_tray = pystray.Icon(
             "mauscribe",
@@ -57,4 +57,5 @@ class AudioRecorder:
         # If multichannel, downmix to mono
         if audio.ndim == 2 and audio.shape[1] > 1:
             audio = np.mean(audio, axis=1)
-        return audio.astype(np.float32)
+        # Chunks are float32 already, so this does not copy the buffer again
+        return audio.astype(np.float32, copy=False)
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, Callable
+import functools
 import re
 
 try:
@@ -11,6 +12,9 @@ except ImportError:
 
 from . import config
 
+# Einmal kompiliert statt bei jedem Aufruf neu aufgelöst
+_WORD_PATTERN = re.compile(r'\b[a-zA-ZäöüßÄÖÜ]+\b')
+
 
 class SpellGrammarChecker:
     """
@@ -22,6 +26,7 @@ class SpellGrammarChecker:
     
     def __init__(self) -> None:
         self._spell_checker: Optional[SpellChecker] = None
+        self._candidates: Optional[Callable[[str], Optional[Set[str]]]] = None
         self._language = config.SPELL_CHECK_LANGUAGE
         self._enabled = config.SPELL_CHECK_ENABLED and SPELL_CHECKER_AVAILABLE
         self._grammar_check = config.SPELL_CHECK_GRAMMAR
@@ -69,6 +74,10 @@ class SpellGrammarChecker:
                 },
             ])
         
+        # Muster einmalig kompilieren
+        for rule in patterns:
+            rule['regex'] = re.compile(rule['pattern'], re.IGNORECASE)
+        
         return patterns
     
     def _initialize_spell_checker(self) -> None:
@@ -81,16 +90,13 @@ class SpellGrammarChecker:
         try:
             print(f"Initialisiere Rechtschreibprüfung für Sprache: {self._language}")
             
-            # Sprachcode anpassen
-            lang_code = self._language
-            if lang_code == "de":
-                lang_code = "de"
-            elif lang_code == "en":
-                lang_code = "en"
-            else:
-                lang_code = "en"  # Fallback
+            # Sprachcode anpassen (Fallback: Englisch)
+            lang_code = self._language if self._language in ("de", "en") else "en"
             
             self._spell_checker = SpellChecker(language=lang_code)
+            # Kandidatensuche (Edit-Distanz 2) ist teuer - Ergebnis pro Wort merken,
+            # dieselben Wörter tauchen in Diktaten immer wieder auf
+            self._candidates = functools.lru_cache(maxsize=1024)(self._spell_checker.candidates)
             print("Rechtschreibprüfung erfolgreich initialisiert")
         except Exception as e:
             print(f"Fehler beim Initialisieren der Rechtschreibprüfung: {e}")
@@ -116,28 +122,15 @@ class SpellGrammarChecker:
             # 1. Grammatikregeln anwenden
             if self._grammar_check:
                 for rule in self._grammar_patterns:
-                    if re.search(rule['pattern'], corrected_text, re.IGNORECASE):
-                        old_text = corrected_text
-                        if 'correction' in rule:
-                            corrected_text = re.sub(
-                                rule['pattern'], 
-                                rule['correction'], 
-                                corrected_text,
-                                flags=re.IGNORECASE
-                            )
-                        else:
-                            corrected_text = re.sub(
-                                rule['pattern'], 
-                                rule['replacement'], 
-                                corrected_text,
-                                flags=re.IGNORECASE
-                            )
-                        
-                        if old_text != corrected_text:
-                            corrections_made.append(f"Grammatik: {rule['description']}")
+                    # Suchen und Ersetzen in einem Durchlauf
+                    replacement = rule['correction'] if 'correction' in rule else rule['replacement']
+                    new_text, count = rule['regex'].subn(replacement, corrected_text)
+                    if count and new_text != corrected_text:
+                        corrected_text = new_text
+                        corrections_made.append(f"Grammatik: {rule['description']}")
             
             # 2. Rechtschreibprüfung
-            words = re.findall(r'\b[a-zA-ZäöüßÄÖÜ]+\b', corrected_text)
+            words = _WORD_PATTERN.findall(corrected_text)
             misspelled = self._spell_checker.unknown(words)
             
             if misspelled:
@@ -145,27 +138,36 @@ class SpellGrammarChecker:
                     self._print_suggestions(text, misspelled)
                 elif self._auto_correct:
                     # Automatische Korrektur
+                    replacements: Dict[str, str] = {}
                     for word in misspelled:
-                        candidates = self._spell_checker.candidates(word)
+                        candidates = self._candidates(word)
                         if candidates:
                             best_candidate = min(candidates, key=lambda x: abs(len(x) - len(word)))
                             # Nur ersetzen wenn ähnlich genug
                             if self._is_similar_word(word, best_candidate):
-                                corrected_text = re.sub(
-                                    r'\b' + re.escape(word) + r'\b',
-                                    best_candidate,
-                                    corrected_text,
-                                    flags=re.IGNORECASE
-                                )
+                                replacements[word.lower()] = best_candidate
                                 corrections_made.append(f"Rechtschreibung: {word} -> {best_candidate}")
+                    
+                    # Alle Ersetzungen in einem Durchlauf statt ein re.sub pro Wort
+                    if replacements:
+                        words_pattern = re.compile(
+                            r'\b(?:' + '|'.join(
+                                re.escape(word) for word in sorted(replacements, key=len, reverse=True)
+                            ) + r')\b',
+                            re.IGNORECASE
+                        )
+                        corrected_text = words_pattern.sub(
+                            lambda m: replacements.get(m.group(0).lower(), m.group(0)),
+                            corrected_text
+                        )
             
             # Ergebnis ausgeben
             if corrections_made and corrected_text != text:
-                print(f"Korrekturen angewendet:")
-                for correction in corrections_made:
-                    print(f"  - {correction}")
-                print(f"  Vorher: {text}")
-                print(f"  Nachher: {corrected_text}")
+                lines = ["Korrekturen angewendet:"]
+                lines.extend(f"  - {correction}" for correction in corrections_made)
+                lines.append(f"  Vorher: {text}")
+                lines.append(f"  Nachher: {corrected_text}")
+                print("\n".join(lines))
             
             return corrected_text
                 
@@ -190,20 +192,22 @@ class SpellGrammarChecker:
     
     def _print_suggestions(self, text: str, misspelled: Set[str]) -> None:
         """Zeigt Korrekturvorschläge an."""
-        print(f"\nRechtschreibprüfung für: '{text}'")
-        print("=" * 50)
+        # Ausgabe sammeln und in einem Schreibvorgang ausgeben
+        lines = [f"\nRechtschreibprüfung für: '{text}'", "=" * 50]
         
         for i, word in enumerate(misspelled, 1):
-            candidates = self._spell_checker.candidates(word)
-            print(f"{i}. Fehler: '{word}'")
+            candidates = self._candidates(word)
+            lines.append(f"{i}. Fehler: '{word}'")
             
             if candidates:
                 suggestions = list(candidates)[:3]  # Top 3
                 suggestions_str = ", ".join([f"'{s}'" for s in suggestions])
-                print(f"   Vorschläge: {suggestions_str}")
+                lines.append(f"   Vorschläge: {suggestions_str}")
             else:
-                print("   Keine Vorschläge gefunden")
-            print()
+                lines.append("   Keine Vorschläge gefunden")
+            lines.append("")
+        
+        print("\n".join(lines))
     
     def get_suggestions(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -217,11 +221,11 @@ class SpellGrammarChecker:
         
         try:
             suggestions = []
-            words = re.findall(r'\b[a-zA-ZäöüßÄÖÜ]+\b', text)
+            words = _WORD_PATTERN.findall(text)
             misspelled = self._spell_checker.unknown(words)
             
             for word in misspelled:
-                candidates = self._spell_checker.candidates(word)
+                candidates = self._candidates(word)
                 if candidates:
                     error_info = {
                         'error_text': word,
@@ -251,6 +255,7 @@ class SpellGrammarChecker:
                 print(f"Fehler beim Schließen des SpellCheckers: {e}")
             finally:
                 self._spell_checker = None
+                self._candidates = None
     
     def __del__(self) -> None:
         """Destruktor zum Aufräumen."""
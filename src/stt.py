@@ -19,8 +19,8 @@ class SpeechToText:
         if audio_f32_mono.size == 0:
             return ""
         # faster-whisper expects 16kHz float32 mono. We record at 16kHz already.
-        # Ensure shape (n,), dtype float32
-        audio = audio_f32_mono.astype(np.float32).flatten()
+        # Ensure shape (n,), dtype float32 - without copying when it already is
+        audio = np.asarray(audio_f32_mono, dtype=np.float32).ravel()
         lang = language or config.LANGUAGE
         segments, info = self._model.transcribe(
             audio=audio,
@@ -1,19 +1,20 @@
 from __future__ import annotations
-import os
 import sys
-import json
 import shutil
 import subprocess
 import tempfile
 import threading
 import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple
-from urllib.parse import urlparse
 import zipfile
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
@@ -26,6 +27,8 @@ GITHUB_REPO = "R0bes/Mauscribe"  # GitHub-Repository für Mauscribe
 CURRENT_VERSION = "1.0.0"  # Aktuelle Version
 UPDATE_CHECK_INTERVAL = 24 * 60 * 60  # 24 Stunden in Sekunden
 USER_AGENT = "Mauscribe-Updater/1.0"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # Bytes pro Lese-/Schreibvorgang beim Download
+RATE_LIMIT_FALLBACK_WAIT = 60  # Sekunden Pause bei unlesbarem Retry-After
 
 
 class UpdateInfo:
@@ -63,10 +66,33 @@ class AutoUpdater:
         self._stop_event = threading.Event()
         self._is_checking = False
         self._current_version = CURRENT_VERSION
+        self._session: Optional["requests.Session"] = None
+        self._rate_limited_until = 0.0
+        # (ETag, Antwort) des letzten Release-Checks für bedingte Anfragen;
+        # als ein Tupel, damit ETag und Body immer zusammenpassen
+        self._release_cache: Optional[Tuple[str, Dict[str, Any]]] = None
         
         if self._enabled:
             self._start_update_thread()
     
+    def _get_session(self) -> "requests.Session":
+        """Gibt die gemeinsame HTTP-Session zurück (Keep-Alive, Connection-Pooling)."""
+        if self._session is None:
+            session = requests.Session()
+            session.headers.update({"User-Agent": USER_AGENT})
+            # Kurzzeitige Serverfehler automatisch mit Backoff wiederholen;
+            # Retry-After wertet allein _check_rate_limit aus (sonst schläft
+            # urllib3 ungedeckelt im Updater-Thread)
+            retries = Retry(total=3, backoff_factor=0.3,
+                            status_forcelist=(500, 502, 503, 504),
+                            allowed_methods=frozenset({"GET"}),
+                            respect_retry_after_header=False,
+                            raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+    
     def _start_update_thread(self) -> None:
         """Startet den Update-Check-Thread."""
         if self._update_thread and self._update_thread.is_alive():
@@ -84,10 +110,8 @@ class AutoUpdater:
         """Hauptschleife für Update-Checks."""
         while not self._stop_event.is_set():
             try:
-                # Warte bis zum nächsten Check
-                time.sleep(self._check_interval)
-                
-                if self._stop_event.is_set():
+                # Warte bis zum nächsten Check (wacht bei stop() sofort auf)
+                if self._stop_event.wait(self._check_interval):
                     break
                 
                 # Update-Check durchführen
@@ -95,7 +119,7 @@ class AutoUpdater:
                 
             except Exception as e:
                 print(f"Fehler im Update-Check-Thread: {e}")
-                time.sleep(60)  # Kurze Pause bei Fehlern
+                self._stop_event.wait(60)  # Kurze Pause bei Fehlern
     
     def _check_for_updates_silent(self) -> None:
         """Führt einen stillen Update-Check durch."""
@@ -148,19 +172,78 @@ class AutoUpdater:
         finally:
             self._is_checking = False
     
+    def _check_rate_limit(self, response: "requests.Response") -> bool:
+        """
+        Prüft eine GitHub-Antwort auf Rate-Limiting.
+        
+        Returns:
+            True wenn das Rate-Limit erreicht ist (Wartezeit wird gemerkt)
+        """
+        if response.status_code not in (403, 429):
+            return False
+        
+        headers = response.headers
+        wait_seconds = None
+        if "Retry-After" in headers:
+            wait_seconds = self._parse_retry_after(headers["Retry-After"])
+        if (wait_seconds is None and headers.get("X-RateLimit-Remaining") == "0"
+                and "X-RateLimit-Reset" in headers):
+            try:
+                wait_seconds = float(headers["X-RateLimit-Reset"]) - time.time()
+            except ValueError:
+                pass
+        if wait_seconds is None:
+            if "Retry-After" not in headers:
+                return False
+            # Unlesbares Retry-After: trotzdem pausieren
+            wait_seconds = RATE_LIMIT_FALLBACK_WAIT
+        
+        self._rate_limited_until = time.time() + max(wait_seconds, 1.0)
+        print(f"GitHub Rate-Limit erreicht, nächster Versuch in {int(max(wait_seconds, 1.0))} Sekunden")
+        return True
+    
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        """Wertet Retry-After aus (Sekunden oder HTTP-Datum)."""
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return retry_at.timestamp() - time.time()
+    
     def _fetch_latest_release(self) -> Optional[UpdateInfo]:
         """Holt die neueste Release-Information von GitHub."""
+        # Während eines Rate-Limits keine weiteren Anfragen schicken
+        if time.time() < self._rate_limited_until:
+            print("Update-Check übersprungen (GitHub Rate-Limit aktiv)")
+            return None
+        
         try:
             url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-            headers = {
-                "User-Agent": USER_AGENT,
-                "Accept": "application/vnd.github.v3+json"
-            }
+            headers = {"Accept": "application/vnd.github.v3+json"}
+            # Unverändertes Release -> 304 ohne Body (ohne Token zählt die
+            # Anfrage trotzdem gegen das Rate-Limit)
+            release_cache = self._release_cache
+            if release_cache is not None:
+                headers["If-None-Match"] = release_cache[0]
             
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = self._get_session().get(url, headers=headers, timeout=10)
+            if self._check_rate_limit(response):
+                return None
             
-            data = response.json()
+            if response.status_code == 304 and release_cache is not None:
+                data = release_cache[1]
+            else:
+                response.raise_for_status()
+                data = response.json()
+                etag = response.headers.get("ETag")
+                self._release_cache = (etag, data) if etag else None
             
             # Assets durchsuchen (nach .exe oder .zip)
             download_url = None
@@ -225,14 +308,14 @@ class AutoUpdater:
             download_path = temp_dir / f"mauscribe_update_{update_info.version}.zip"
             
             # Download mit Fortschrittsanzeige
-            response = requests.get(update_info.download_url, stream=True, timeout=30)
+            response = self._get_session().get(update_info.download_url, stream=True, timeout=30)
             response.raise_for_status()
             
             total_size = int(response.headers.get("content-length", 0))
             downloaded = 0
             
             with open(download_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     if chunk:
                         f.write(chunk)
                         downloaded += len(chunk)
@@ -297,14 +380,12 @@ class AutoUpdater:
     def _install_from_zip(self, zip_path: Path, install_dir: Path) -> None:
         """Installiert ein Update aus einer ZIP-Datei."""
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # Alle Dateien extrahieren
-            zip_ref.extractall(install_dir)
-            
-            # Berechtigungen setzen
-            for file_path in zip_ref.namelist():
-                extracted_file = install_dir / file_path
-                if extracted_file.is_file():
-                    extracted_file.chmod(0o755)
+            # Einzeln extrahieren und Berechtigungen setzen; extract() bereinigt
+            # den Namen (.., Laufwerk, ungültige Zeichen) und liefert den echten Pfad
+            for member in zip_ref.infolist():
+                extracted_path = zip_ref.extract(member, install_dir)
+                if not member.is_dir():
+                    Path(extracted_path).chmod(0o755)
     
     def _rollback_update(self, backup_path: Path) -> None:
         """Rollback bei fehlgeschlagener Installation."""
@@ -353,6 +434,9 @@ class AutoUpdater:
         self._stop_event.set()
         if self._update_thread and self._update_thread.is_alive():
             self._update_thread.join(timeout=5)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
         print("Auto-Updater gestoppt")
 
 